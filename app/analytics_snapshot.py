@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from app.models import AnalyticsResponse
+from app.services import AnalyticsService
+from app.config import settings
+from app.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsSnapshot:
+    """Pre-serialized analytics payload recomputed by a background task"""
+
+    def __init__(self, analytics_service: AnalyticsService, interval: float = None):
+        self.analytics_service = analytics_service
+        self.interval = settings.ANALYTICS_REFRESH_INTERVAL if interval is None else interval
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.generated_at: Optional[datetime] = None
+        self.headers: Dict[str, str] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _build(self) -> AnalyticsResponse:
+        """Compute analytics from the database (runs in a worker thread)"""
+        with tracer.trace("analytics.refresh", background=True):
+            return AnalyticsResponse(
+                daily_stats=self.analytics_service.get_daily_stats(),
+                weekly_stats=self.analytics_service.get_weekly_stats(),
+                provider_comparison=self.analytics_service.get_provider_comparison(),
+                source_comparison=self.analytics_service.get_source_comparison(),
+                generated_at=datetime.utcnow()
+            )
+
+    async def refresh(self):
+        """Recompute analytics off the event loop and swap in the new snapshot"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            analytics = await loop.run_in_executor(None, self._build)
+
+            # The ETag covers the statistics only, so a refresh with unchanged data still yields a 304
+            data = analytics.model_dump_json(exclude={"generated_at"}).encode()
+            self.etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+            self.body = analytics.model_dump_json().encode()
+            self.generated_at = analytics.generated_at
+            # Last-Modified tells a client holding a matching ETag how fresh its copy is
+            self.headers = {
+                "ETag": self.etag,
+                "Last-Modified": format_datetime(self.generated_at.replace(tzinfo=timezone.utc), usegmt=True),
+                "Cache-Control": "no-cache"
+            }
+
+    async def get(self):
+        """Return the current (body, headers), building the first snapshot if needed"""
+        if self.body is None:
+            await self.refresh()
+        return self.body, self.headers
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header matches the current ETag (weak comparison)"""
+        if not if_none_match or self.etag is None:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == "*" or candidate == self.etag:
+                return True
+        return False
+
+    async def _run(self):
+        # Writes refresh the snapshot through the live update hub; this loop covers day rollover and idle periods
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Analytics snapshot refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background refresh task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
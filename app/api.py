@@ -1,16 +1,21 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+import secrets
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-import uuid
+from fastapi.responses import HTMLResponse, StreamingResponse, PlainTextResponse
 from typing import List
 
 from app.models import (
     ChatRequest, ChatResponse, RatingRequest, RatingResponse,
+    BulkRatingRequest, BulkRatingResponse, BulkRatingResult,
     ConversationHistory, AnalyticsResponse, FAQItem, ProviderInfo
 )
 from app.services import ChatService, RatingService, AnalyticsService, FAQService
+from app.analytics_snapshot import AnalyticsSnapshot
+from app.live_updates import LiveUpdateHub
+from app.serialization import rows_response, ResponseFormat
+from app.tracing import tracer, span, TracingMiddleware, SamplingProfiler
 from app.llm_providers import LLMProviderFactory
 from app.database import create_tables
 from app.config import settings
@@ -31,16 +36,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Trace requests while tracing is enabled (a single flag check otherwise)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # Initialize services
 chat_service = ChatService()
 rating_service = RatingService()
 analytics_service = AnalyticsService()
 faq_service = FAQService()
+analytics_snapshot = AnalyticsSnapshot(analytics_service)
+live_hub = LiveUpdateHub(analytics_snapshot)
+profiler = SamplingProfiler()
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Allow admin endpoints only with the configured ADMIN_TOKEN"""
+    if not settings.ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin access required")
 
-# Create database tables on startup
+# Create database tables on startup (a no-op if this process already did it)
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    if settings.DB_AUTO_INIT:
+        create_tables()
+    analytics_snapshot.start()
+    live_hub.start()
+    
+    # Import provider SDKs in a worker thread so the first chat request does not block the event loop
+    asyncio.get_running_loop().run_in_executor(None, LLMProviderFactory.warm_up)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await analytics_snapshot.stop()
+    await live_hub.stop()
 
 # API Routes
 @app.post("/api/chat", response_model=ChatResponse)
@@ -52,8 +79,21 @@ async def chat(request: ChatRequest):
             provider=request.provider,
             session_id=request.session_id
         )
+        # Validate and encode here so the span covers all serialization work of the response
+        with span("chat.serialize"):
+            response = ChatResponse(**result)
+            body = response.model_dump_json()
         
-        return ChatResponse(**result)
+        live_hub.publish_conversation(ConversationHistory(
+            id=response.conversation_id,
+            user_message=request.message,
+            llm_provider=response.provider,
+            llm_response=response.response,
+            answer_source=response.answer_source,
+            timestamp=response.timestamp
+        ).model_dump(mode="json"))
+        
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -68,41 +108,80 @@ async def rate_conversation(request: RatingRequest):
         )
         
         if success:
+            live_hub.publish_rating(request.conversation_id, request.rating, request.feedback)
             return RatingResponse(success=True, message="Rating saved successfully")
         else:
             return RatingResponse(success=False, message="Failed to save rating")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/analytics", response_model=AnalyticsResponse)
-async def get_analytics():
-    """Get daily and weekly analytics"""
+@app.post("/api/rate/bulk", response_model=BulkRatingResponse)
+async def rate_conversations_bulk(request: BulkRatingRequest):
+    """Rate many conversations in one request"""
     try:
-        daily_stats = analytics_service.get_daily_stats()
-        weekly_stats = analytics_service.get_weekly_stats()
-        provider_comparison = analytics_service.get_provider_comparison()
+        results = rating_service.save_ratings([item.model_dump() for item in request.ratings])
         
-        return AnalyticsResponse(
-            daily_stats=daily_stats,
-            weekly_stats=weekly_stats,
-            provider_comparison=provider_comparison
+        saved = 0
+        for item, result in zip(request.ratings, results):
+            if result["success"]:
+                saved += 1
+            if result["status"] == "saved":
+                live_hub.publish_rating(item.conversation_id, item.rating, item.feedback)
+        
+        return BulkRatingResponse(
+            saved=saved,
+            failed=len(results) - saved,
+            results=[BulkRatingResult(**result) for result in results]
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/analytics", response_model=AnalyticsResponse)
+async def get_analytics(request: Request):
+    """Get daily and weekly analytics from the latest snapshot"""
+    try:
+        body, headers = await analytics_snapshot.get()
+        
+        if analytics_snapshot.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=body, media_type="application/json", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/live")
+async def live_updates(request: Request):
+    """Stream conversation, rating and analytics deltas as server-sent events"""
+    subscriber = live_hub.subscribe()
+    return StreamingResponse(
+        live_hub.stream(subscriber, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/conversations", response_model=List[ConversationHistory])
-async def get_conversation_history(session_id: str = None, limit: int = 50):
-    """Get conversation history"""
+async def get_conversation_history(session_id: str = None,
+                                   limit: int = Query(50, ge=1, le=settings.HISTORY_MAX_LIMIT),
+                                   response_format: ResponseFormat = Query("json", alias="format")):
+    """Get conversation history (format=ndjson streams rows from the database one object per line)"""
     try:
-        return analytics_service.get_conversation_history(session_id, limit)
+        if response_format == "ndjson":
+            rows = analytics_service.iter_conversation_history_rows(session_id, limit)
+        else:
+            rows = analytics_service.get_conversation_history_rows(session_id, limit)
+        return rows_response(AnalyticsService.HISTORY_COLUMNS, rows, response_format, "conversations.serialize")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/faqs", response_model=List[FAQItem])
-async def get_faqs():
-    """Get all FAQ items"""
+async def get_faqs(response_format: ResponseFormat = Query("json", alias="format")):
+    """Get all FAQ items (format=ndjson streams rows from the database one object per line)"""
     try:
-        return faq_service.get_all_faqs()
+        if response_format == "ndjson":
+            rows = faq_service.iter_faq_rows()
+        else:
+            rows = faq_service.get_all_faq_rows()
+        return rows_response(FAQService.COLUMNS, rows, response_format, "faqs.serialize")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -138,6 +217,37 @@ async def get_providers():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/admin/traces", dependencies=[Depends(require_admin)])
+async def get_slowest_traces(limit: int = Query(20, ge=1, le=200)):
+    """Get the slowest requests and background jobs of the current trace windows with their span breakdowns"""
+    return {
+        "enabled": tracer.enabled,
+        "traces": tracer.slowest(limit),
+        "background": tracer.slowest(limit, background=True)
+    }
+
+@app.post("/api/admin/tracing", dependencies=[Depends(require_admin)])
+async def set_tracing(enabled: bool):
+    """Turn request tracing on or off (recorded traces stay readable)"""
+    tracer.enabled = enabled
+    return {"enabled": tracer.enabled}
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def run_profiler(seconds: float = Query(10, gt=0, le=60)):
+    """Sample all threads for N seconds and download the stacks in folded (flame graph) format"""
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        loop = asyncio.get_running_loop()
+        folded = await loop.run_in_executor(None, profiler.run, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'}
+    )
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -14,12 +14,38 @@ class Settings:
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./customer_support_bot.db")
+    DB_AUTO_INIT: bool = os.getenv("DB_AUTO_INIT", "True").lower() == "true"
     
     # LLM Configuration
     DEFAULT_MODEL: str = os.getenv("DEFAULT_MODEL", "openai")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1000"))
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
     
+    # FAQ Direct Answers (messages matching an FAQ above the threshold skip the LLM)
+    FAQ_DIRECT_ANSWERS: bool = os.getenv("FAQ_DIRECT_ANSWERS", "True").lower() == "true"
+    FAQ_MATCH_THRESHOLD: float = float(os.getenv("FAQ_MATCH_THRESHOLD", "0.8"))
+    FAQ_CACHE_TTL: float = float(os.getenv("FAQ_CACHE_TTL", "300"))
+    
+    # Analytics Snapshot (seconds between background recomputations)
+    ANALYTICS_REFRESH_INTERVAL: float = float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "30"))
+    
+    # Conversation History (largest page the history endpoint will return)
+    HISTORY_MAX_LIMIT: int = int(os.getenv("HISTORY_MAX_LIMIT", "1000"))
+    
+    # Live Updates (server-sent events pushed to dashboards)
+    LIVE_UPDATES_COALESCE_WINDOW: float = float(os.getenv("LIVE_UPDATES_COALESCE_WINDOW", "0.25"))
+    LIVE_UPDATES_QUEUE_SIZE: int = int(os.getenv("LIVE_UPDATES_QUEUE_SIZE", "16"))
+    LIVE_UPDATES_KEEPALIVE: float = float(os.getenv("LIVE_UPDATES_KEEPALIVE", "15"))
+    LIVE_UPDATES_REBUILD_INTERVAL: float = float(os.getenv("LIVE_UPDATES_REBUILD_INTERVAL", "10"))
+    LIVE_UPDATES_TRACKED_CONVERSATIONS: int = int(os.getenv("LIVE_UPDATES_TRACKED_CONVERSATIONS", "10000"))
+    
+    # Tracing and Profiling (admin endpoints are disabled while ADMIN_TOKEN is empty)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    TRACE_WINDOW: float = float(os.getenv("TRACE_WINDOW", "300"))
+    PROFILER_INTERVAL: float = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    
     # Available LLM Providers (only OpenAI and Google)
     AVAILABLE_PROVIDERS = ["openai", "google"]
     
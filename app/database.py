@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Text, DateTime, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Create database engine
 engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
@@ -19,6 +22,7 @@ class Conversation(Base):
     user_message = Column(Text)
     llm_provider = Column(String, index=True)
     llm_response = Column(Text)
+    answer_source = Column(String, default="llm")  # "faq" or "llm"
     timestamp = Column(DateTime, default=datetime.utcnow)
     rating = relationship("Rating", back_populates="conversation", uselist=False)
 
@@ -26,7 +30,7 @@ class Rating(Base):
     __tablename__ = "ratings"
     
     id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"))
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), unique=True, index=True)
     rating = Column(Integer)  # 1-5 scale
     feedback = Column(Text, nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -41,9 +45,56 @@ class FAQ(Base):
     category = Column(String, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+# Columns added after the initial schema, applied to existing databases on startup
+ADDED_COLUMNS = {
+    "conversations": {
+        "answer_source": "VARCHAR DEFAULT 'llm'",
+    },
+}
+
+# Unique indexes added after the initial schema, as index name -> (table, column)
+ADDED_UNIQUE_INDEXES = {
+    "ix_ratings_conversation_id": ("ratings", "conversation_id"),
+}
+
+_schema_ready = False
+
 # Create tables
 def create_tables():
-    Base.metadata.create_all(bind=engine)
+    global _schema_ready
+    if _schema_ready:
+        return
+    with engine.begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        _add_missing_columns(connection)
+        _add_missing_unique_indexes(connection)
+    # Pooled SQLite connections keep the schema they saw when opened, so drop them after DDL
+    engine.dispose()
+    _schema_ready = True
+
+def _add_missing_columns(connection):
+    """Add columns that create_all does not add to tables that already exist"""
+    inspector = inspect(connection)
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+def _add_missing_unique_indexes(connection):
+    """Create unique indexes on existing tables, keeping only the newest row of any duplicates"""
+    inspector = inspect(connection)
+    for name, (table, column) in ADDED_UNIQUE_INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+        result = connection.execute(text(
+            f"DELETE FROM {table} WHERE {column} IS NOT NULL AND id NOT IN "
+            f"(SELECT MAX(id) FROM {table} GROUP BY {column})"
+        ))
+        if result.rowcount:
+            logger.warning(f"Removed {result.rowcount} duplicate row(s) from {table} before creating {name}")
+        connection.execute(text(f"CREATE UNIQUE INDEX {name} ON {table} ({column})"))
 
 # Database dependency
 def get_db():
@@ -0,0 +1,112 @@
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+from app.database import get_db, FAQ
+from app.config import settings
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Seconds between reload attempts while the FAQ table is empty (e.g. seeding has not run yet)
+EMPTY_RETRY_INTERVAL = 5
+
+# Words that carry no meaning for matching a question to an FAQ entry
+STOP_WORDS = {
+    "a", "an", "the", "is", "are", "do", "does", "did", "you", "your", "i", "my",
+    "me", "we", "our", "can", "could", "how", "what", "to", "of", "for", "in",
+    "on", "it", "be", "please", "hi", "hello", "there", "any", "and", "or", "which", "s",
+}
+
+def normalize(text: str) -> str:
+    """Lowercase text and collapse it to space-separated words"""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+def keywords(normalized: str) -> frozenset:
+    """Get the meaningful words of a normalized string"""
+    return frozenset(word for word in normalized.split() if word not in STOP_WORDS)
+
+class FAQMatcher:
+    """Fast local matcher that scores a message against the FAQ corpus"""
+
+    def __init__(self, threshold: float = None, ttl: float = None):
+        self.threshold = settings.FAQ_MATCH_THRESHOLD if threshold is None else threshold
+        self.ttl = settings.FAQ_CACHE_TTL if ttl is None else ttl
+        self._entries: Optional[List[Tuple[str, frozenset, str]]] = None
+        self._exact = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reload the FAQ corpus from the database"""
+        db = next(get_db())
+        try:
+            rows = db.query(FAQ.question, FAQ.answer).all()
+        finally:
+            db.close()
+        self.load(rows)
+
+    def load(self, rows: List[Tuple[str, str]]):
+        """Index (question, answer) pairs as the FAQ corpus"""
+        entries = []
+        exact = {}
+        for question, answer in rows:
+            normalized = normalize(question)
+            entries.append((normalized, keywords(normalized), answer))
+            exact.setdefault(normalized, answer)
+
+        with self._lock:
+            self._entries = entries
+            self._exact = exact
+            self._loaded_at = time.monotonic()
+
+    def _corpus(self) -> List[Tuple[str, frozenset, str]]:
+        # Reload after the TTL so FAQ edits are picked up, and retry sooner while the table is empty
+        age = time.monotonic() - self._loaded_at
+        if self._entries is None or age > self.ttl or (not self._entries and age > EMPTY_RETRY_INTERVAL):
+            self.refresh()
+        return self._entries
+
+    def match(self, message: str) -> Tuple[Optional[str], float]:
+        """Return the best FAQ answer for the message and its confidence score"""
+        entries = self._corpus()
+        normalized = normalize(message)
+        if not normalized:
+            return None, 0.0
+
+        # Near-verbatim copies hit the exact index without any scoring
+        answer = self._exact.get(normalized)
+        if answer is not None:
+            return answer, 1.0
+
+        # Rank candidates by keyword overlap (cheap), then confirm the best with a character-level ratio.
+        # A message that adds a keyword the FAQ question lacks ("... for returns?", "... not accept?")
+        # asks something the FAQ does not answer, so only entries covering every keyword qualify.
+        message_keywords = keywords(normalized)
+        if not message_keywords:
+            return None, 0.0
+
+        best_entry = None
+        best_overlap = 0.0
+        for entry in entries:
+            entry_keywords = entry[1]
+            if not message_keywords <= entry_keywords:
+                continue
+            overlap = len(message_keywords & entry_keywords) / len(message_keywords | entry_keywords)
+            if overlap > best_overlap:
+                best_entry, best_overlap = entry, overlap
+
+        if best_entry is None:
+            return None, 0.0
+
+        ratio = SequenceMatcher(None, normalized, best_entry[0]).ratio()
+        score = round((best_overlap + ratio) / 2, 4)
+        return best_entry[2], score
+
+    def find_answer(self, message: str) -> Optional[str]:
+        """Return an FAQ answer if the match is confident enough to skip the LLM"""
+        answer, score = self.match(message)
+        if answer is not None and score >= self.threshold:
+            return answer
+        return None
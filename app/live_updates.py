@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Set
+
+from app.analytics_snapshot import AnalyticsSnapshot
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+KEEPALIVE = b": keepalive\n\n"
+
+class Subscriber:
+    """A connected dashboard with a small bounded queue of encoded events"""
+
+    __slots__ = ("queue", "ready", "overflowed")
+
+    def __init__(self, max_queue: int):
+        self.queue = deque(maxlen=max_queue)
+        self.ready = asyncio.Event()
+        self.overflowed = False
+
+    def push(self, message: bytes):
+        # A consumer that fell a full queue behind gets one resync instead of a growing backlog
+        if len(self.queue) == self.queue.maxlen:
+            self.queue.clear()
+            self.overflowed = True
+        if not self.overflowed:
+            self.queue.append(message)
+        self.ready.set()
+
+    def drain(self) -> list:
+        if self.overflowed:
+            self.overflowed = False
+            self.queue.clear()
+            messages = [RESYNC]
+        else:
+            messages = list(self.queue)
+            self.queue.clear()
+        self.ready.clear()
+        return messages
+
+class LiveUpdateHub:
+    """Fan-out hub that pushes coalesced conversation and rating deltas to dashboards
+
+    Writes are turned into per-provider deltas from in-memory totals without touching the
+    database. The full analytics snapshot is rebuilt separately, at most once per rebuild
+    interval and only while dashboards are connected, and then corrects any drift.
+    """
+
+    def __init__(self, snapshot: AnalyticsSnapshot, coalesce_window: float = None, max_queue: int = None,
+                 rebuild_interval: float = None):
+        self.snapshot = snapshot
+        self.coalesce_window = settings.LIVE_UPDATES_COALESCE_WINDOW if coalesce_window is None else coalesce_window
+        self.max_queue = settings.LIVE_UPDATES_QUEUE_SIZE if max_queue is None else max_queue
+        self.rebuild_interval = (settings.LIVE_UPDATES_REBUILD_INTERVAL
+                                 if rebuild_interval is None else rebuild_interval)
+        self.subscribers: Set[Subscriber] = set()
+        self._conversations: Dict[int, Dict[str, Any]] = {}
+        self._ratings: Dict[int, Dict[str, Any]] = {}
+        self._changed_providers: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._needs_rebuild = True
+        # Raw per-provider totals (conversations, ratings, rating_sum), seeded by each rebuild
+        self._provider_totals: Optional[Dict[str, Dict[str, int]]] = None
+        # Provider, answer source and current rating of conversations published by this process
+        self._tracked: OrderedDict = OrderedDict()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish_conversation(self, conversation: Dict[str, Any]):
+        """Queue a new conversation summary and its provider delta for the next broadcast"""
+        self._conversations[conversation["id"]] = conversation
+        self._track(conversation["id"], [conversation["llm_provider"], conversation["answer_source"], None])
+        if conversation["answer_source"] == "llm":
+            self._add_to_totals(conversation["llm_provider"], conversations=1)
+        self._needs_rebuild = True
+        self._schedule_flush()
+
+    def publish_rating(self, conversation_id: int, rating: int, feedback: str = None):
+        """Queue a rating change and its provider delta for the next broadcast"""
+        self._ratings[conversation_id] = {
+            "conversation_id": conversation_id,
+            "rating": rating,
+            "feedback": feedback
+        }
+        tracked = self._tracked.get(conversation_id)
+        if tracked is not None:
+            provider, answer_source, previous = tracked
+            if answer_source == "llm":
+                if previous is None:
+                    self._add_to_totals(provider, ratings=1, rating_sum=rating)
+                else:
+                    self._add_to_totals(provider, rating_sum=rating - previous)
+            tracked[2] = rating
+        # Ratings of conversations this process did not publish are only reflected by the next rebuild
+        self._needs_rebuild = True
+        self._schedule_flush()
+
+    def _track(self, conversation_id: int, state: list):
+        self._tracked[conversation_id] = state
+        if len(self._tracked) > settings.LIVE_UPDATES_TRACKED_CONVERSATIONS:
+            self._tracked.popitem(last=False)
+
+    def _add_to_totals(self, provider: str, conversations: int = 0, ratings: int = 0, rating_sum: int = 0):
+        if self._provider_totals is None:
+            return
+        totals = self._provider_totals.setdefault(provider, {"conversations": 0, "ratings": 0, "rating_sum": 0})
+        totals["conversations"] += conversations
+        totals["ratings"] += ratings
+        totals["rating_sum"] += rating_sum
+        self._changed_providers.add(provider)
+
+    def _provider_stats(self, providers) -> Dict[str, Dict[str, Any]]:
+        """Format totals like the provider_comparison entries of the analytics payload"""
+        stats = {}
+        for provider in providers:
+            totals = self._provider_totals[provider]
+            stats[provider] = {
+                "total_conversations": totals["conversations"],
+                "average_rating": round(totals["rating_sum"] / totals["ratings"], 2) if totals["ratings"] else 0.0,
+                "total_ratings": totals["ratings"]
+            }
+        return stats
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        # Let a burst of writes accumulate into one message; no database work happens here
+        await asyncio.sleep(self.coalesce_window)
+        conversations = list(self._conversations.values())
+        ratings = list(self._ratings.values())
+        providers = self._provider_stats(self._changed_providers) if self._provider_totals is not None else {}
+        self._conversations = {}
+        self._ratings = {}
+        self._changed_providers = set()
+
+        # Encode once; every subscriber receives the same message
+        self._broadcast(b"event: delta\ndata: " + json.dumps(
+            {"conversations": conversations, "ratings": ratings, "providers": providers},
+            separators=(",", ":")
+        ).encode() + b"\n\n")
+
+    async def _rebuild(self):
+        """Recompute the snapshot and provider totals, then send the full analytics to dashboards"""
+        self._needs_rebuild = False
+        try:
+            await self.snapshot.refresh()
+            loop = asyncio.get_running_loop()
+            totals = await loop.run_in_executor(None, self.snapshot.analytics_service.get_provider_totals)
+        except Exception as e:
+            logger.error(f"Live update analytics rebuild failed: {e}")
+            self._needs_rebuild = True
+            return
+        self._provider_totals = totals
+        self._broadcast(b"event: analytics\ndata: " + self.snapshot.body + b"\n\n")
+
+    async def _run(self):
+        while True:
+            if self._needs_rebuild and (self.subscribers or self._provider_totals is None):
+                await self._rebuild()
+            await asyncio.sleep(self.rebuild_interval)
+
+    def start(self):
+        """Start the periodic rebuild task on the running event loop"""
+        if self._rebuild_task is None:
+            self._rebuild_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the periodic rebuild task"""
+        if self._rebuild_task is not None:
+            self._rebuild_task.cancel()
+            try:
+                await self._rebuild_task
+            except asyncio.CancelledError:
+                pass
+            self._rebuild_task = None
+
+    def _broadcast(self, message: bytes):
+        for subscriber in self.subscribers:
+            subscriber.push(message)
+
+    async def stream(self, subscriber: Subscriber, is_disconnected):
+        """Yield server-sent events for a subscriber until the client disconnects"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), timeout=settings.LIVE_UPDATES_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield KEEPALIVE
+                    continue
+                for message in subscriber.drain():
+                    yield message
+        finally:
+            self.unsubscribe(subscriber)
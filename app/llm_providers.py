@@ -1,5 +1,4 @@
-import openai
-import google.generativeai as genai
+import importlib
 from typing import Dict, Any, Optional
 from app.config import settings
 import logging
@@ -25,9 +24,13 @@ class LLMProvider:
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT provider"""
     
+    SDK_MODULE = "openai"
+    
     def _setup_client(self):
         if not settings.OPENAI_API_KEY:
             raise ValueError("OpenAI API key not configured")
+        # Imported here so the SDK is only loaded when this provider is configured and used
+        import openai
         openai.api_key = settings.OPENAI_API_KEY
         self.client = openai
     
@@ -58,9 +61,13 @@ class OpenAIProvider(LLMProvider):
 class GoogleProvider(LLMProvider):
     """Google Gemini provider"""
     
+    SDK_MODULE = "google.generativeai"
+    
     def _setup_client(self):
         if not settings.GOOGLE_API_KEY:
             raise ValueError("Google API key not configured")
+        # Imported here so the SDK is only loaded when this provider is configured and used
+        import google.generativeai as genai
         genai.configure(api_key=settings.GOOGLE_API_KEY)
         self.client = genai.GenerativeModel('gemini-2.5-flash-lite')
     
@@ -83,18 +90,32 @@ class GoogleProvider(LLMProvider):
 class LLMProviderFactory:
     """Factory class to create LLM providers"""
     
+    PROVIDERS = {
+        "openai": OpenAIProvider,
+        "google": GoogleProvider
+    }
+    
+    @staticmethod
+    def validate_provider(provider_name: str):
+        """Raise ValueError for provider names the factory cannot create"""
+        if provider_name not in LLMProviderFactory.PROVIDERS:
+            raise ValueError(f"Unknown provider: {provider_name}")
+    
     @staticmethod
     def create_provider(provider_name: str) -> LLMProvider:
         """Create and return an LLM provider instance"""
-        providers = {
-            "openai": OpenAIProvider,
-            "google": GoogleProvider
-        }
-        
-        if provider_name not in providers:
-            raise ValueError(f"Unknown provider: {provider_name}")
-        
-        return providers[provider_name](provider_name)
+        LLMProviderFactory.validate_provider(provider_name)
+        return LLMProviderFactory.PROVIDERS[provider_name](provider_name)
+    
+    @staticmethod
+    def warm_up():
+        """Import the SDKs of configured providers so the first request does not pay for it"""
+        for provider_name in LLMProviderFactory.get_available_providers():
+            module = LLMProviderFactory.PROVIDERS[provider_name].SDK_MODULE
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                logger.error(f"Failed to import {module}: {e}")
     
     @staticmethod
     def get_available_providers() -> list:
@@ -12,6 +12,7 @@ class ChatResponse(BaseModel):
     provider: str = Field(..., description="LLM provider used")
     session_id: str = Field(..., description="Session ID")
     conversation_id: int = Field(..., description="Database conversation ID")
+    answer_source: str = Field("llm", description="Where the answer came from (faq or llm)")
     timestamp: datetime = Field(..., description="Response timestamp")
 
 class RatingRequest(BaseModel):
@@ -23,11 +24,26 @@ class RatingResponse(BaseModel):
     success: bool = Field(..., description="Whether rating was saved successfully")
     message: str = Field(..., description="Response message")
 
+class BulkRatingRequest(BaseModel):
+    ratings: List[RatingRequest] = Field(..., min_length=1, max_length=5000, description="Ratings to save")
+
+class BulkRatingResult(BaseModel):
+    conversation_id: int = Field(..., description="ID of the rated conversation")
+    success: bool = Field(..., description="Whether this rating was applied (saved or superseded within the request)")
+    status: str = Field(..., description="saved, superseded, not_found or error")
+    message: str = Field(..., description="Result message")
+
+class BulkRatingResponse(BaseModel):
+    saved: int = Field(..., description="Number of ratings that succeeded, including superseded ones")
+    failed: int = Field(..., description="Number of ratings that failed")
+    results: List[BulkRatingResult] = Field(..., description="Per-item results in request order")
+
 class ConversationHistory(BaseModel):
     id: int
     user_message: str
     llm_provider: str
     llm_response: str
+    answer_source: str = "llm"
     timestamp: datetime
     rating: Optional[int] = None
     feedback: Optional[str] = None
@@ -36,6 +52,8 @@ class AnalyticsResponse(BaseModel):
     daily_stats: dict = Field(..., description="Daily performance statistics")
     weekly_stats: dict = Field(..., description="Weekly performance statistics")
     provider_comparison: dict = Field(..., description="Provider performance comparison")
+    source_comparison: dict = Field(default_factory=dict, description="Performance comparison by answer source (faq/llm)")
+    generated_at: Optional[datetime] = Field(None, description="When these statistics were computed")
 
 class FAQItem(BaseModel):
     id: int
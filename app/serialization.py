@@ -0,0 +1,40 @@
+from typing import Iterable, Iterator, Literal, Sequence
+
+import orjson
+from fastapi.responses import Response, StreamingResponse
+
+from app.tracing import span, timed_iter
+
+# Encodings supported by list endpoints
+ResponseFormat = Literal["json", "ndjson"]
+
+# Rows per chunk when streaming NDJSON
+NDJSON_CHUNK_SIZE = 500
+
+def encode_rows(columns: Sequence[str], rows: Iterable[tuple]) -> bytes:
+    """Encode database row tuples as a JSON array of objects in one pass"""
+    return orjson.dumps([dict(zip(columns, row)) for row in rows])
+
+def iter_ndjson(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encode database row tuples as newline-delimited JSON, one chunk at a time"""
+    chunk = []
+    for row in rows:
+        chunk.append(orjson.dumps(dict(zip(columns, row))))
+        if len(chunk) == NDJSON_CHUNK_SIZE:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+def rows_response(columns: Sequence[str], rows: Iterable[tuple], response_format: ResponseFormat = "json",
+                  span_name: str = "serialize") -> Response:
+    """Build a pre-encoded JSON or NDJSON response from database row tuples
+
+    The encoding is recorded as span_name; for NDJSON that is the time spent producing the
+    streamed chunks, including reading rows that are fetched while streaming.
+    """
+    if response_format == "ndjson":
+        return StreamingResponse(timed_iter(span_name, iter_ndjson(columns, rows)), media_type="application/x-ndjson")
+    with span(span_name):
+        content = encode_rows(columns, rows)
+    return Response(content=content, media_type="application/json")
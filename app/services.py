@@ -1,42 +1,85 @@
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select, literal, Integer, Text, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app.database import get_db, Conversation, Rating, FAQ
 from app.llm_providers import LLMProviderFactory
-from app.models import ConversationHistory, AnalyticsResponse
+from app.faq_matcher import FAQMatcher
+from app.config import settings
+from app.serialization import NDJSON_CHUNK_SIZE
+from app.tracing import span, traced
+
+def _stream_rows(db: Session, query) -> Iterator[tuple]:
+    """Execute a query and return an iterator over its rows fetched in batches
+
+    The session stays open while the iterator is consumed and is closed once it is exhausted
+    or closed, so a streaming response can pull rows straight from the cursor.
+    """
+    try:
+        result = iter(query.yield_per(NDJSON_CHUNK_SIZE))
+    except Exception:
+        db.close()
+        raise
+
+    def rows():
+        try:
+            for row in result:
+                yield tuple(row)
+        finally:
+            db.close()
+
+    return rows()
 
 class ChatService:
     """Service for handling chat interactions"""
     
     def __init__(self):
         self.factory = LLMProviderFactory()
+        self.faq_matcher = FAQMatcher()
     
     async def process_message(self, message: str, provider: str, session_id: str = None) -> Dict[str, Any]:
         """Process a user message and return LLM response"""
         if not session_id:
             session_id = str(uuid.uuid4())
         
+        # Reject unknown providers even when the FAQ tier would answer without one
+        self.factory.validate_provider(provider)
+        
         try:
-            # Create LLM provider
-            llm_provider = self.factory.create_provider(provider)
+            # Answer directly from the FAQ corpus when the match is confident enough
+            response = None
+            if settings.FAQ_DIRECT_ANSWERS:
+                with span("chat.faq_match"):
+                    response = self.faq_matcher.find_answer(message)
+            answer_source = "faq"
             
-            # Get FAQ context for better responses
-            context = self._get_faq_context(message)
-            
-            # Generate response
-            response = await llm_provider.generate_response(message, context)
+            if response is None:
+                # Create LLM provider
+                with span("chat.create_provider"):
+                    llm_provider = self.factory.create_provider(provider)
+                
+                # Get FAQ context for better responses
+                with span("chat.faq_context"):
+                    context = self._get_faq_context(message)
+                
+                # Generate response
+                with span("chat.provider_call"):
+                    response = await llm_provider.generate_response(message, context)
+                answer_source = "llm"
             
             # Save conversation to database
-            conversation_id = self._save_conversation(session_id, message, provider, response)
+            with span("chat.save_conversation"):
+                conversation_id = self._save_conversation(session_id, message, provider, response, answer_source)
             
             return {
                 "response": response,
                 "provider": provider,
                 "session_id": session_id,
                 "conversation_id": conversation_id,
+                "answer_source": answer_source,
                 "timestamp": datetime.utcnow()
             }
             
@@ -61,7 +104,8 @@ class ChatService:
         finally:
             db.close()
     
-    def _save_conversation(self, session_id: str, message: str, provider: str, response: str) -> int:
+    def _save_conversation(self, session_id: str, message: str, provider: str, response: str,
+                           answer_source: str = "llm") -> int:
         """Save conversation to database"""
         db = next(get_db())
         try:
@@ -69,7 +113,8 @@ class ChatService:
                 session_id=session_id,
                 user_message=message,
                 llm_provider=provider,
-                llm_response=response
+                llm_response=response,
+                answer_source=answer_source
             )
             db.add(conversation)
             db.commit()
@@ -81,43 +126,120 @@ class ChatService:
 class RatingService:
     """Service for handling conversation ratings"""
     
+    def _insert(self, db: Session):
+        """Get the dialect-specific insert construct that supports ON CONFLICT"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert(Rating)
+        if dialect == "postgresql":
+            return postgresql.insert(Rating)
+        raise ValueError(f"Rating upserts are not supported on {dialect}")
+    
+    def _on_conflict_update(self, statement):
+        """Turn a rating insert into an upsert keyed on conversation_id"""
+        return statement.on_conflict_do_update(
+            index_elements=[Rating.conversation_id],
+            set_={
+                "rating": statement.excluded.rating,
+                "feedback": statement.excluded.feedback,
+                "timestamp": statement.excluded.timestamp
+            }
+        )
+    
     def save_rating(self, conversation_id: int, rating: int, feedback: str = None) -> bool:
         """Save a rating for a conversation"""
         db = next(get_db())
         try:
-            # Check if conversation exists
-            conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-            if not conversation:
-                return False
-            
-            # Check if rating already exists
-            existing_rating = db.query(Rating).filter(Rating.conversation_id == conversation_id).first()
-            if existing_rating:
-                # Update existing rating
-                existing_rating.rating = rating
-                existing_rating.feedback = feedback
-                existing_rating.timestamp = datetime.utcnow()
-            else:
-                # Create new rating
-                new_rating = Rating(
-                    conversation_id=conversation_id,
-                    rating=rating,
-                    feedback=feedback
-                )
-                db.add(new_rating)
+            # Insert from a SELECT on conversations so a missing conversation inserts nothing
+            source = select(
+                Conversation.id,
+                literal(rating, Integer),
+                literal(feedback, Text),
+                literal(datetime.utcnow(), DateTime)
+            ).where(Conversation.id == conversation_id)
+            statement = self._insert(db).from_select(
+                ["conversation_id", "rating", "feedback", "timestamp"], source
+            )
             
-            db.commit()
-            return True
+            with span("rating.upsert"):
+                result = db.execute(self._on_conflict_update(statement))
+                db.commit()
+            return result.rowcount > 0
             
         except Exception as e:
             db.rollback()
             return False
         finally:
             db.close()
+    
+    def save_ratings(self, ratings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Save many ratings at once and return a result per item, in request order"""
+        conversation_ids = {item["conversation_id"] for item in ratings}
+        
+        # The last rating for a conversation wins, as if the items were saved one by one.
+        # Earlier ones are reported as successful so a client retrying failures never resends them.
+        latest = {item["conversation_id"]: index for index, item in enumerate(ratings)}
+        
+        db = next(get_db())
+        try:
+            with span("rating.bulk_validate"):
+                existing = {
+                    conversation_id for (conversation_id,) in
+                    db.query(Conversation.id).filter(Conversation.id.in_(conversation_ids))
+                }
+            
+            now = datetime.utcnow()
+            rows = [
+                {
+                    "conversation_id": item["conversation_id"],
+                    "rating": item["rating"],
+                    "feedback": item.get("feedback"),
+                    "timestamp": now
+                }
+                for index, item in enumerate(ratings)
+                if item["conversation_id"] in existing and latest[item["conversation_id"]] == index
+            ]
+            
+            if rows:
+                with span("rating.bulk_upsert"):
+                    db.execute(self._on_conflict_update(self._insert(db)), rows)
+                    db.commit()
+            
+        except Exception as e:
+            db.rollback()
+            return [
+                {"conversation_id": item["conversation_id"], "success": False, "status": "error",
+                 "message": "Failed to save rating"}
+                for item in ratings
+            ]
+        finally:
+            db.close()
+        
+        results = []
+        for index, item in enumerate(ratings):
+            conversation_id = item["conversation_id"]
+            if conversation_id not in existing:
+                result = (False, "not_found", "Conversation not found")
+            elif latest[conversation_id] != index:
+                result = (True, "superseded", "Superseded by a later rating for the same conversation")
+            else:
+                result = (True, "saved", "Rating saved successfully")
+            results.append({
+                "conversation_id": conversation_id,
+                "success": result[0],
+                "status": result[1],
+                "message": result[2]
+            })
+        
+        return results
 
 class AnalyticsService:
     """Service for generating analytics and performance metrics"""
     
+    HISTORY_COLUMNS = ("id", "user_message", "llm_provider", "llm_response", "answer_source",
+                       "timestamp", "rating", "feedback")
+    
+    @traced("analytics.daily_stats")
     def get_daily_stats(self) -> Dict[str, Any]:
         """Get daily performance statistics"""
         db = next(get_db())
@@ -145,6 +267,7 @@ class AnalyticsService:
         finally:
             db.close()
     
+    @traced("analytics.weekly_stats")
     def get_weekly_stats(self) -> Dict[str, Any]:
         """Get weekly performance statistics"""
         db = next(get_db())
@@ -172,29 +295,32 @@ class AnalyticsService:
         finally:
             db.close()
     
+    @traced("analytics.provider_comparison")
     def get_provider_comparison(self) -> Dict[str, Any]:
         """Compare performance across different LLM providers"""
         db = next(get_db())
         try:
-            providers = db.query(Conversation.llm_provider).distinct().all()
+            # Direct FAQ answers never reached a provider; they are compared in get_source_comparison
+            llm_answered = func.coalesce(Conversation.answer_source, "llm") == "llm"
+            providers = db.query(Conversation.llm_provider).filter(llm_answered).distinct().all()
             comparison = {}
             
             for (provider,) in providers:
                 # Get provider stats
                 total_conversations = db.query(Conversation).filter(
-                    Conversation.llm_provider == provider
+                    Conversation.llm_provider == provider, llm_answered
                 ).count()
                 
                 # Get average rating for provider
                 avg_rating = db.query(func.avg(Rating.rating)).join(Conversation).filter(
-                    Conversation.llm_provider == provider
+                    Conversation.llm_provider == provider, llm_answered
                 ).scalar() or 0
                 
                 comparison[provider] = {
                     "total_conversations": total_conversations,
                     "average_rating": round(float(avg_rating), 2),
                     "total_ratings": db.query(Rating).join(Conversation).filter(
-                        Conversation.llm_provider == provider
+                        Conversation.llm_provider == provider, llm_answered
                     ).count()
                 }
             
@@ -202,47 +328,106 @@ class AnalyticsService:
         finally:
             db.close()
     
-    def get_conversation_history(self, session_id: str = None, limit: int = 50) -> List[ConversationHistory]:
-        """Get conversation history"""
+    @traced("analytics.provider_totals")
+    def get_provider_totals(self) -> Dict[str, Dict[str, int]]:
+        """Get raw per-provider conversation and rating totals for LLM-answered conversations"""
         db = next(get_db())
         try:
-            query = db.query(Conversation).outerjoin(Rating)
+            rows = db.query(
+                Conversation.llm_provider,
+                func.count(Conversation.id),
+                func.count(Rating.id),
+                func.coalesce(func.sum(Rating.rating), 0)
+            ).outerjoin(Rating, Rating.conversation_id == Conversation.id).filter(
+                func.coalesce(Conversation.answer_source, "llm") == "llm"
+            ).group_by(Conversation.llm_provider).all()
             
-            if session_id:
-                query = query.filter(Conversation.session_id == session_id)
+            return {
+                provider: {"conversations": conversations, "ratings": ratings, "rating_sum": int(rating_sum)}
+                for provider, conversations, ratings, rating_sum in rows
+            }
+        finally:
+            db.close()
+    
+    @traced("analytics.source_comparison")
+    def get_source_comparison(self) -> Dict[str, Any]:
+        """Compare performance of direct FAQ answers against LLM answers"""
+        db = next(get_db())
+        try:
+            source = func.coalesce(Conversation.answer_source, "llm")
+            counts = db.query(source, func.count(Conversation.id)).group_by(source).all()
+            ratings = db.query(source, func.avg(Rating.rating), func.count(Rating.id)).join(
+                Rating, Rating.conversation_id == Conversation.id
+            ).group_by(source).all()
+            rating_stats = {name: (avg_rating, total) for name, avg_rating, total in ratings}
             
-            conversations = query.order_by(desc(Conversation.timestamp)).limit(limit).all()
+            comparison = {}
+            for name, total_conversations in counts:
+                avg_rating, total_ratings = rating_stats.get(name, (0, 0))
+                comparison[name] = {
+                    "total_conversations": total_conversations,
+                    "average_rating": round(float(avg_rating or 0), 2),
+                    "total_ratings": total_ratings
+                }
             
-            history = []
-            for conv in conversations:
-                rating = conv.rating.rating if conv.rating else None
-                feedback = conv.rating.feedback if conv.rating else None
-                
-                history.append(ConversationHistory(
-                    id=conv.id,
-                    user_message=conv.user_message,
-                    llm_provider=conv.llm_provider,
-                    llm_response=conv.llm_response,
-                    timestamp=conv.timestamp,
-                    rating=rating,
-                    feedback=feedback
-                ))
-            
-            return history
+            return comparison
         finally:
             db.close()
+    
+    def _history_query(self, db: Session, session_id: str = None, limit: int = 50):
+        query = db.query(
+            Conversation.id,
+            Conversation.user_message,
+            Conversation.llm_provider,
+            Conversation.llm_response,
+            func.coalesce(Conversation.answer_source, "llm"),
+            Conversation.timestamp,
+            Rating.rating,
+            Rating.feedback
+        ).outerjoin(Rating, Rating.conversation_id == Conversation.id)
+        
+        if session_id:
+            query = query.filter(Conversation.session_id == session_id)
+        
+        return query.order_by(desc(Conversation.timestamp)).limit(limit)
+    
+    @traced("analytics.conversation_history_rows")
+    def get_conversation_history_rows(self, session_id: str = None, limit: int = 50) -> List[tuple]:
+        """Get conversation history as plain tuples ordered like HISTORY_COLUMNS"""
+        db = next(get_db())
+        try:
+            return [tuple(row) for row in self._history_query(db, session_id, limit)]
+        finally:
+            db.close()
+    
+    @traced("analytics.conversation_history_rows")
+    def iter_conversation_history_rows(self, session_id: str = None, limit: int = 50) -> Iterator[tuple]:
+        """Get conversation history as an iterator of tuples read from the open cursor in batches"""
+        db = next(get_db())
+        return _stream_rows(db, self._history_query(db, session_id, limit))
 
 class FAQService:
     """Service for managing FAQ data"""
     
-    def get_all_faqs(self) -> List[FAQ]:
-        """Get all FAQ items"""
+    COLUMNS = ("id", "question", "answer", "category", "created_at")
+    
+    def _faq_query(self, db: Session):
+        query = db.query(FAQ.id, FAQ.question, FAQ.answer, FAQ.category, FAQ.created_at)
+        return query.order_by(FAQ.category, FAQ.created_at)
+    
+    def get_all_faq_rows(self) -> List[tuple]:
+        """Get all FAQ items as plain tuples ordered like COLUMNS"""
         db = next(get_db())
         try:
-            return db.query(FAQ).order_by(FAQ.category, FAQ.created_at).all()
+            return [tuple(row) for row in self._faq_query(db)]
         finally:
             db.close()
     
+    def iter_faq_rows(self) -> Iterator[tuple]:
+        """Get all FAQ items as an iterator of tuples read from the open cursor in batches"""
+        db = next(get_db())
+        return _stream_rows(db, self._faq_query(db))
+    
     def search_faqs(self, query: str) -> List[FAQ]:
         """Search FAQs by query"""
         db = next(get_db())
@@ -0,0 +1,267 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.config import settings
+
+class _NoopSpan:
+    """Shared context manager used whenever no trace is active"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NOOP = _NoopSpan()
+
+class Trace:
+    """Timing of one request (or background job) broken down into spans"""
+
+    __slots__ = ("name", "started_at", "start", "duration", "status", "spans")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.status = None
+        self.spans = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 3), "duration_ms": round(duration * 1000, 3)}
+                for name, offset, duration in self.spans
+            ]
+        }
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.trace.spans.append((self.name, self.start - self.trace.start, end - self.start))
+        return False
+
+class SlowestTraces:
+    """Keeps the N slowest traces of the current and the previous time window
+
+    Each window has a bounded min-heap keyed on duration, so a slow trace stays visible until
+    its window has passed no matter how many fast traces finish after it. The previous window
+    is kept so the view never starts out empty right after a rollover.
+    """
+
+    def __init__(self, size: int, window: float):
+        self.size = size
+        self.window = window
+        self._current = []
+        self._previous = []
+        self._window_start = time.monotonic()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float):
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return
+        # A gap longer than a whole window leaves nothing recent enough to keep
+        self._previous = self._current if elapsed < 2 * self.window else []
+        self._current = []
+        self._window_start = now - elapsed % self.window
+
+    def append(self, trace: Trace):
+        # The counter breaks duration ties so traces themselves are never compared
+        entry = (trace.duration, next(self._counter), trace)
+        with self._lock:
+            self._rotate(time.monotonic())
+            if len(self._current) < self.size:
+                heapq.heappush(self._current, entry)
+            elif entry[0] > self._current[0][0]:
+                heapq.heapreplace(self._current, entry)
+
+    def slowest(self, limit: int) -> List[Trace]:
+        with self._lock:
+            self._rotate(time.monotonic())
+            entries = heapq.nlargest(limit, self._current + self._previous)
+        return [trace for _, _, trace in entries]
+
+    def clear(self):
+        with self._lock:
+            self._current = []
+            self._previous = []
+
+    def __len__(self):
+        return len(self._current) + len(self._previous)
+
+class _TraceContext:
+    __slots__ = ("buffer", "trace", "token")
+
+    def __init__(self, buffer: SlowestTraces, name: str):
+        self.buffer = buffer
+        self.trace = Trace(name)
+
+    def __enter__(self):
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, *exc_info):
+        self.trace.duration = time.perf_counter() - self.trace.start
+        if exc_type is not None and self.trace.status is None:
+            self.trace.status = exc_type.__name__
+        _current_trace.reset(self.token)
+        self.buffer.append(self.trace)
+        return False
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+class Tracer:
+    """Records span timings of traced requests and background jobs, keeping the slowest per time window"""
+
+    def __init__(self, enabled: bool = None, buffer_size: int = None, window: float = None):
+        self.enabled = settings.TRACING_ENABLED if enabled is None else enabled
+        buffer_size = settings.TRACE_BUFFER_SIZE if buffer_size is None else buffer_size
+        window = settings.TRACE_WINDOW if window is None else window
+        self.requests = SlowestTraces(buffer_size, window)
+        # Kept apart so periodic jobs never push request traces out of the slowest list
+        self.background = SlowestTraces(buffer_size, window)
+
+    def trace(self, name: str, background: bool = False):
+        """Start a trace for the current context; a no-op while tracing is disabled"""
+        if not self.enabled:
+            return NOOP
+        return _TraceContext(self.background if background else self.requests, name)
+
+    def span(self, name: str):
+        """Time a stage of the current trace; a no-op outside a trace"""
+        trace = _current_trace.get()
+        if trace is None:
+            return NOOP
+        return _Span(trace, name)
+
+    def traced(self, name: str):
+        """Decorator that wraps a whole function in a span"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterable:
+        """Record the time spent producing an iterator's items as one span of the current trace
+
+        Streamed bodies are consumed after the endpoint returns (and possibly in another thread),
+        so the trace is captured here and the span is recorded once the iterator is done.
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            return iterable
+        return self._timed_iter(trace, name, iterable)
+
+    @staticmethod
+    def _timed_iter(trace: Trace, name: str, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        start = time.perf_counter()
+        busy = 0.0
+        try:
+            while True:
+                resumed = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    busy += time.perf_counter() - resumed
+                yield item
+        finally:
+            trace.spans.append((name, start - trace.start, busy))
+
+    def slowest(self, limit: int = 20, background: bool = False) -> List[Dict[str, Any]]:
+        """Return the slowest request (or background job) traces of the current and previous window"""
+        buffer = self.background if background else self.requests
+        return [trace.to_dict() for trace in buffer.slowest(limit)]
+
+class TracingMiddleware:
+    """ASGI middleware that traces each HTTP request while tracing is enabled"""
+
+    # Long-lived or static responses that would only add noise to the slowest list
+    SKIP_PREFIXES = ("/static", "/api/live", "/api/admin")
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if not self.tracer.enabled or scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        with self.tracer.trace(f"{scope['method']} {scope['path']}") as trace:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    trace.status = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+class SamplingProfiler:
+    """Samples the stacks of all threads and aggregates them in folded (flame graph) format"""
+
+    def __init__(self, interval: float = None):
+        self.interval = settings.PROFILER_INTERVAL if interval is None else interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float) -> str:
+        """Sample for the given number of seconds (blocking) and return folded stacks"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            counts = Counter()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    counts[";".join(reversed(stack))] += 1
+                time.sleep(self.interval)
+            return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+        finally:
+            self._lock.release()
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
+timed_iter = tracer.timed_iter
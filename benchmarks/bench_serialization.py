@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for list endpoints
+Compares CPU time per 1,000 conversation rows for the Pydantic response_model
+path and the tuple + orjson path used by /api/conversations
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from app.models import ConversationHistory
+from app.serialization import encode_rows, iter_ndjson
+from app.services import AnalyticsService
+
+ROWS = 1000
+REPEAT = 50
+
+def make_rows(count: int) -> List[tuple]:
+    """Build synthetic history rows shaped like get_conversation_history_rows"""
+    start = datetime(2024, 1, 1)
+    return [
+        (
+            i,
+            f"How long does shipping take for order {i}?",
+            "openai" if i % 2 else "google",
+            "Standard shipping takes 3-5 business days. Express shipping is also available. " * 3,
+            "faq" if i % 5 == 0 else "llm",
+            start + timedelta(minutes=i),
+            (i % 5) + 1 if i % 3 else None,
+            "Helpful answer" if i % 7 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+def pydantic_path(rows: List[tuple]) -> bytes:
+    """Previous path: one model per row, then response_model validation and serialization"""
+    history = [ConversationHistory(**dict(zip(AnalyticsService.HISTORY_COLUMNS, row))) for row in rows]
+    adapter = TypeAdapter(List[ConversationHistory])
+    return adapter.dump_json(adapter.validate_python(history))
+
+def orjson_path(rows: List[tuple]) -> bytes:
+    return encode_rows(AnalyticsService.HISTORY_COLUMNS, rows)
+
+def ndjson_path(rows: List[tuple]) -> bytes:
+    return b"".join(iter_ndjson(AnalyticsService.HISTORY_COLUMNS, rows))
+
+def measure(func, rows: List[tuple]) -> float:
+    """Return CPU microseconds per 1,000 rows"""
+    func(rows)
+    start = time.process_time()
+    for _ in range(REPEAT):
+        func(rows)
+    elapsed = time.process_time() - start
+    return elapsed / REPEAT / len(rows) * 1000 * 1_000_000
+
+def main():
+    rows = make_rows(ROWS)
+    results = {
+        "pydantic response_model": measure(pydantic_path, rows),
+        "tuples + orjson (json)": measure(orjson_path, rows),
+        "tuples + orjson (ndjson)": measure(ndjson_path, rows),
+    }
+    baseline = results["pydantic response_model"]
+
+    print(f"CPU per 1,000 rows ({ROWS} rows x {REPEAT} runs)")
+    for name, micros in results.items():
+        print(f"  {name:<26} {micros:>10.0f} us  ({baseline / micros:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Reports the import-time breakdown of app.api, the time from process spawn
+to the first successful request, the cost of the provider SDK imports that
+are deferred to a background warm-up, and the worst request latency while
+that warm-up runs, so cold start regressions show up
+"""
+
+import sys
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOP_IMPORTS = 15
+RUNS = 3
+READY_TIMEOUT = 30
+STALL_WINDOW = 3
+
+# SDKs that should only load when a request uses their provider
+LAZY_MODULES = ["openai", "google.generativeai"]
+
+def import_breakdown():
+    """Return (cumulative_us, module) pairs for importing app.api, largest first"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.api"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), module.rstrip()))
+    return sorted(entries, reverse=True)
+
+def eagerly_imported():
+    """Return which lazily-loaded SDKs are imported by app.api anyway"""
+    check = "import sys, app.api; print(','.join(m for m in %r if m in sys.modules))" % LAZY_MODULES
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+def sdk_import_costs():
+    """Return seconds to import each lazily-loaded SDK once app.api is loaded"""
+    costs = {}
+    for module in LAZY_MODULES:
+        script = (
+            "import time, app.api; start = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - start)"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+        costs[module] = float(result.stdout.strip().splitlines()[-1])
+    return costs
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def health_latency(port: int) -> float:
+    """Return seconds for one /api/health round trip, raising OSError if the server is not up"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=5) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def run_server(database_url: str, extra_env: dict = None):
+    """Spawn the server and return (process, port, seconds until /api/health answers)"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, **(extra_env or {}))
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    while time.perf_counter() - start < READY_TIMEOUT:
+        try:
+            health_latency(port)
+            return server, port, time.perf_counter() - start
+        except OSError:
+            time.sleep(0.01)
+    server.terminate()
+    server.wait()
+    raise RuntimeError("Server did not become ready in time")
+
+def time_to_first_request(database_url: str) -> float:
+    """Spawn the server and return seconds until /api/health answers"""
+    server, _, ready = run_server(database_url)
+    server.terminate()
+    server.wait()
+    return ready
+
+def worst_latency_during_warm_up(database_url: str) -> float:
+    """With both providers configured, return the slowest /api/health answer in the first seconds after ready"""
+    server, port, _ = run_server(database_url, {"OPENAI_API_KEY": "bench", "GOOGLE_API_KEY": "bench"})
+    try:
+        worst = 0.0
+        deadline = time.perf_counter() + STALL_WINDOW
+        while time.perf_counter() < deadline:
+            worst = max(worst, health_latency(port))
+        return worst
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    print(f"Import time breakdown for app.api (top {TOP_IMPORTS} by cumulative time)")
+    for cumulative, module in import_breakdown()[:TOP_IMPORTS]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    eager = eagerly_imported()
+    print(f"\nProvider SDKs imported at startup: {', '.join(eager) if eager else 'none'}")
+
+    # Run against a copy of the database so the benchmark never touches real data
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        source = os.path.join(ROOT, "customer_support_bot.db")
+        if os.path.exists(source):
+            shutil.copy(source, database)
+        timings = [time_to_first_request(f"sqlite:///{database}") for _ in range(RUNS)]
+        stall = worst_latency_during_warm_up(f"sqlite:///{database}")
+
+    print(f"\nTime to first ready request ({RUNS} runs)")
+    print(f"  best {min(timings) * 1000:.0f} ms, median {sorted(timings)[len(timings) // 2] * 1000:.0f} ms")
+
+    print("\nProvider SDK import cost (paid by the background warm-up, not the first chat request)")
+    for module, cost in sdk_import_costs().items():
+        print(f"  {cost * 1000:>8.0f} ms  {module}")
+
+    print(f"\nWorst /api/health latency in the first {STALL_WINDOW} s with both providers configured")
+    print(f"  {stall * 1000:.0f} ms")
+
+    if eager:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
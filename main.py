@@ -5,7 +5,6 @@ Main application entry point
 """
 
 import uvicorn
-from app.api import app
 from app.config import settings
 from app.database import create_tables
 from app.seed_data import seed_faq_data
@@ -14,13 +13,14 @@ def main():
     """Main application function"""
     print("🚀 Starting Customer Support Bot...")
     
-    # Create database tables
-    print("📊 Setting up database...")
-    create_tables()
-    
-    # Seed FAQ data
-    print("🌱 Seeding FAQ data...")
-    seed_faq_data()
+    if settings.DB_AUTO_INIT:
+        # Create database tables
+        print("📊 Setting up database...")
+        create_tables()
+        
+        # Seed FAQ data
+        print("🌱 Seeding FAQ data...")
+        seed_faq_data()
     
     # Start the server
     print(f"🌐 Starting server on {settings.HOST}:{settings.PORT}")
@@ -3,6 +3,9 @@ let currentProvider = null;
 let currentSessionId = null;
 let currentConversationId = null;
 let selectedRating = 0;
+let conversationHistory = [];
+let liveSource = null;
+let providerComparison = {};
 
 // DOM elements
 const providerButtons = document.getElementById('providerButtons');
@@ -22,6 +25,7 @@ document.addEventListener('DOMContentLoaded', function() {
     setupEventListeners();
     loadAnalytics();
     loadConversationHistory();
+    startLiveUpdates();
 });
 
 // Initialize the application
@@ -176,10 +180,6 @@ async function sendMessage() {
         // Add rating button
         addRatingButton();
         
-        // Refresh analytics and history
-        loadAnalytics();
-        loadConversationHistory();
-        
     } catch (error) {
         console.error('Error sending message:', error);
         loadingMessage.remove();
@@ -290,10 +290,6 @@ async function submitRatingHandler() {
         if (result.success) {
             showMessage('Rating submitted successfully!', 'success');
             closeRatingModal();
-            
-            // Refresh analytics
-            loadAnalytics();
-            loadConversationHistory();
         } else {
             showMessage('Failed to submit rating. Please try again.', 'error');
         }
@@ -322,6 +318,8 @@ async function loadAnalytics() {
 
 // Render analytics data
 function renderAnalytics(analytics) {
+    providerComparison = analytics.provider_comparison;
+    
     // Daily stats
     renderDailyStats(analytics.daily_stats);
     
@@ -420,8 +418,63 @@ async function loadConversationHistory() {
     }
 }
 
+// Subscribe to server-pushed analytics and history updates
+function startLiveUpdates() {
+    if (!window.EventSource) return;
+    
+    liveSource = new EventSource('/api/live');
+    let connectedBefore = false;
+    
+    liveSource.addEventListener('open', function() {
+        // Catch up on anything missed while reconnecting
+        if (connectedBefore) {
+            resyncDashboard();
+        }
+        connectedBefore = true;
+    });
+    
+    liveSource.addEventListener('delta', function(e) {
+        applyLiveDelta(JSON.parse(e.data));
+    });
+    
+    // Periodic full analytics that also corrects anything the deltas could not cover
+    liveSource.addEventListener('analytics', function(e) {
+        renderAnalytics(JSON.parse(e.data));
+    });
+    
+    // Sent when this dashboard fell too far behind to receive every delta
+    liveSource.addEventListener('resync', resyncDashboard);
+}
+
+// Reload analytics and history in full
+function resyncDashboard() {
+    loadAnalytics();
+    loadConversationHistory();
+}
+
+// Apply a pushed delta to the dashboard
+function applyLiveDelta(delta) {
+    const known = new Set(conversationHistory.map(c => c.id));
+    const added = delta.conversations.filter(c => !known.has(c.id)).reverse();
+    let history = added.concat(conversationHistory);
+    
+    delta.ratings.forEach(update => {
+        history = history.map(c => c.id === update.conversation_id
+            ? { ...c, rating: update.rating, feedback: update.feedback }
+            : c);
+    });
+    
+    renderConversationHistory(history);
+    
+    if (Object.keys(delta.providers).length) {
+        providerComparison = { ...providerComparison, ...delta.providers };
+        renderProviderChart(providerComparison);
+    }
+}
+
 // Render conversation history
 function renderConversationHistory(conversations) {
+    conversationHistory = conversations.slice(0, 50);
     const container = document.getElementById('conversationList');
     container.innerHTML = '';
     
@@ -435,6 +488,7 @@ function renderConversationHistory(conversations) {
         conversationDiv.innerHTML = `
             <div class="conversation-header">
                 <span class="provider-badge">${conversation.llm_provider}</span>
+                ${conversation.answer_source === 'faq' ? '<span class="provider-badge">FAQ</span>' : ''}
                 <span>${timestamp}</span>
             </div>
             <div class="conversation-content">
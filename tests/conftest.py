@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database before any app module creates the engine
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["DB_AUTO_INIT"] = "False"
+
+from app import database  # noqa: E402
+
+@pytest.fixture
+def db_tables():
+    """Give each test an empty, fully migrated schema"""
+    database.Base.metadata.drop_all(bind=database.engine)
+    database._schema_ready = False
+    database.create_tables()
+    yield
+    database.Base.metadata.drop_all(bind=database.engine)
+    database._schema_ready = False
@@ -0,0 +1,73 @@
+import asyncio
+from email.utils import parsedate_to_datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analytics_snapshot import AnalyticsSnapshot
+from app.api import app
+from app.database import SessionLocal, Conversation, Rating
+from app.services import AnalyticsService
+
+@pytest.fixture
+def snapshot(db_tables):
+    snapshot = AnalyticsSnapshot(AnalyticsService())
+    asyncio.run(snapshot.refresh())
+    return snapshot
+
+def test_refresh_with_unchanged_data_keeps_the_etag(snapshot):
+    etag, generated_at = snapshot.etag, snapshot.generated_at
+    asyncio.run(snapshot.refresh())
+
+    assert snapshot.etag == etag
+    assert snapshot.generated_at >= generated_at
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"other"', False),
+    ("{etag}", True),
+    ("W/{etag}", True),
+    ('"other", {etag}', True),
+    ('W/"other" ,W/{etag}', True),
+    ("*", True),
+])
+def test_if_none_match_parsing(snapshot, header, matches):
+    if header is not None:
+        header = header.format(etag=snapshot.etag)
+    assert snapshot.matches(header) is matches
+
+def test_analytics_endpoint_revalidates(db_tables):
+    client = TestClient(app)
+
+    response = client.get("/api/analytics")
+    assert response.status_code == 200
+    assert "generated_at" in response.json()
+    etag = response.headers["etag"]
+    last_modified = parsedate_to_datetime(response.headers["last-modified"])
+
+    for header in (etag, f"W/{etag}", f'"stale", {etag}'):
+        revalidated = client.get("/api/analytics", headers={"If-None-Match": header})
+        assert revalidated.status_code == 304
+        assert parsedate_to_datetime(revalidated.headers["last-modified"]) >= last_modified
+
+    assert client.get("/api/analytics", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+def test_provider_totals_match_the_provider_comparison(db_tables):
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Conversation(id=1, user_message="q1", llm_provider="openai", llm_response="a1", answer_source="llm"),
+            Conversation(id=2, user_message="q2", llm_provider="openai", llm_response="a2", answer_source="llm"),
+            Conversation(id=3, user_message="q3", llm_provider="openai", llm_response="a3", answer_source="faq"),
+        ])
+        db.add_all([Rating(conversation_id=1, rating=4), Rating(conversation_id=3, rating=1)])
+        db.commit()
+    finally:
+        db.close()
+
+    service = AnalyticsService()
+    assert service.get_provider_totals() == {"openai": {"conversations": 2, "ratings": 1, "rating_sum": 4}}
+    comparison = service.get_provider_comparison()["openai"]
+    assert comparison["total_conversations"] == 2
+    assert comparison["total_ratings"] == 1
+    assert comparison["average_rating"] == 4.0
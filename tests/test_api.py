@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import services
+from app.api import app
+from app.config import settings
+from app.database import SessionLocal, Conversation, FAQ
+from app.services import FAQService
+
+@pytest.fixture
+def client(db_tables):
+    db = SessionLocal()
+    db.add_all([
+        FAQ(question="How can I track my order?", answer="tracking answer", category="Orders"),
+        FAQ(question="What is your return policy?", answer="returns answer", category="Returns"),
+    ])
+    db.commit()
+    db.close()
+    return TestClient(app)
+
+def test_faqs_are_returned_as_a_json_array(client):
+    response = client.get("/api/faqs")
+
+    assert response.status_code == 200
+    assert [faq["category"] for faq in response.json()] == ["Orders", "Returns"]
+
+def test_faqs_stream_as_ndjson(client):
+    response = client.get("/api/faqs", params={"format": "ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["answer"] for line in response.text.splitlines()] == ["tracking answer", "returns answer"]
+
+@pytest.mark.parametrize("path", ["/api/faqs", "/api/conversations"])
+def test_unknown_format_is_rejected(client, path):
+    assert client.get(path, params={"format": "xml"}).status_code == 422
+
+def test_ndjson_reads_rows_while_streaming(client, monkeypatch):
+    monkeypatch.setattr(services, "NDJSON_CHUNK_SIZE", 1)
+    rows = FAQService().iter_faq_rows()
+
+    # The query has run but the session stays open for the remaining rows
+    assert next(rows)[2] == "tracking answer"
+    assert [row[2] for row in rows] == ["returns answer"]
+
+@pytest.mark.parametrize("limit", [0, settings.HISTORY_MAX_LIMIT + 1])
+def test_history_limit_is_bounded(client, limit):
+    assert client.get("/api/conversations", params={"limit": limit}).status_code == 422
+
+def test_history_streams_as_ndjson(client):
+    db = SessionLocal()
+    db.add_all([Conversation(user_message=f"q{i}", llm_provider="openai", llm_response=f"a{i}") for i in range(3)])
+    db.commit()
+    db.close()
+
+    response = client.get("/api/conversations", params={"format": "ndjson", "limit": 2})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 2
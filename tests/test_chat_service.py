@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.database import SessionLocal, FAQ
+from app.services import ChatService, AnalyticsService
+
+@pytest.fixture
+def chat_service(db_tables):
+    db = SessionLocal()
+    db.add(FAQ(question="How can I track my order?", answer="tracking answer", category="Orders"))
+    db.commit()
+    db.close()
+    return ChatService()
+
+def test_faq_answer_skips_the_provider(chat_service):
+    result = asyncio.run(chat_service.process_message("How can I track my order?", "openai"))
+
+    assert result["response"] == "tracking answer"
+    assert result["answer_source"] == "faq"
+    assert result["conversation_id"] is not None
+
+def test_unknown_provider_is_rejected_before_the_faq_tier(chat_service):
+    with pytest.raises(ValueError):
+        asyncio.run(chat_service.process_message("How can I track my order?", "bogus"))
+
+def test_faq_answers_are_kept_out_of_the_provider_comparison(chat_service):
+    asyncio.run(chat_service.process_message("How can I track my order?", "openai"))
+    chat_service._save_conversation("s", "Something else", "openai", "llm answer", "llm")
+
+    analytics = AnalyticsService()
+    assert analytics.get_provider_comparison()["openai"]["total_conversations"] == 1
+    assert analytics.get_source_comparison()["faq"]["total_conversations"] == 1
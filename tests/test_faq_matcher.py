@@ -0,0 +1,69 @@
+import pytest
+
+from app.faq_matcher import FAQMatcher
+
+FAQS = [
+    ("What payment methods do you accept?", "payment answer"),
+    ("How long does shipping take?", "shipping answer"),
+    ("What is your return policy?", "returns answer"),
+    ("How can I track my order?", "tracking answer"),
+]
+
+@pytest.fixture
+def matcher():
+    matcher = FAQMatcher(threshold=0.8)
+    matcher.load(FAQS)
+    return matcher
+
+@pytest.mark.parametrize("message, answer", [
+    ("What payment methods do you accept?", "payment answer"),
+    ("what payment methods do you accept", "payment answer"),
+    ("Which payment methods do you accept?", "payment answer"),
+    ("What's your return policy?", "returns answer"),
+    ("track my order", "tracking answer"),
+])
+def test_near_verbatim_questions_are_answered_directly(matcher, message, answer):
+    assert matcher.find_answer(message) == answer
+
+@pytest.mark.parametrize("message", [
+    "What payment methods do you accept for returns?",
+    "What payment methods do you not accept?",
+    "How long does international shipping take?",
+    "What is your return policy for damaged items?",
+    "Do you ship to Canada?",
+    "Can I pay with bitcoin?",
+    "",
+])
+def test_near_misses_escalate_to_the_llm(matcher, message):
+    assert matcher.find_answer(message) is None
+
+def test_empty_corpus_is_reloaded_once_faqs_are_seeded(db_tables, monkeypatch):
+    from app import faq_matcher
+    from app.database import SessionLocal, FAQ
+
+    matcher = FAQMatcher(threshold=0.8)
+    assert matcher.find_answer("How can I track my order?") is None
+
+    db = SessionLocal()
+    db.add(FAQ(question="How can I track my order?", answer="tracking answer", category="Orders"))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(faq_matcher, "EMPTY_RETRY_INTERVAL", 0)
+    assert matcher.find_answer("How can I track my order?") == "tracking answer"
+
+def test_faq_edits_are_picked_up_after_the_ttl(db_tables):
+    from app.database import SessionLocal, FAQ
+
+    db = SessionLocal()
+    faq = FAQ(question="How can I track my order?", answer="old answer", category="Orders")
+    db.add(faq)
+    db.commit()
+
+    matcher = FAQMatcher(threshold=0.8, ttl=0)
+    assert matcher.find_answer("How can I track my order?") == "old answer"
+
+    faq.answer = "new answer"
+    db.commit()
+    db.close()
+    assert matcher.find_answer("How can I track my order?") == "new answer"
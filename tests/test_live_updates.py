@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from app.live_updates import LiveUpdateHub, RESYNC
+
+class StubAnalytics:
+    def __init__(self, totals):
+        self.totals = totals
+        self.calls = 0
+
+    def get_provider_totals(self):
+        self.calls += 1
+        return {provider: dict(values) for provider, values in self.totals.items()}
+
+class StubSnapshot:
+    """Stands in for AnalyticsSnapshot and counts full refreshes"""
+
+    def __init__(self, totals=None, fail: bool = False):
+        self.analytics_service = StubAnalytics(totals or {})
+        self.fail = fail
+        self.refreshes = 0
+        self.body = b'{"daily_stats":{}}'
+
+    async def refresh(self):
+        self.refreshes += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+
+def events(messages, name):
+    prefix = b"event: " + name.encode()
+    return [json.loads(message.split(b"data: ", 1)[1]) for message in messages if message.startswith(prefix)]
+
+def conversation(conversation_id, provider="openai", answer_source="llm"):
+    return {"id": conversation_id, "llm_provider": provider, "answer_source": answer_source}
+
+def test_writes_push_provider_deltas_without_a_refresh():
+    async def scenario():
+        snapshot = StubSnapshot({"openai": {"conversations": 2, "ratings": 1, "rating_sum": 4}})
+        hub = LiveUpdateHub(snapshot, coalesce_window=0.01, max_queue=16, rebuild_interval=60)
+        await hub._rebuild()
+        subscriber = hub.subscribe()
+
+        hub.publish_conversation(conversation(1))
+        hub.publish_conversation(conversation(2, answer_source="faq"))
+        await asyncio.sleep(0.05)
+        hub.publish_rating(1, 2)
+        await asyncio.sleep(0.05)
+        hub.publish_rating(1, 5)
+        await asyncio.sleep(0.05)
+        return snapshot, subscriber.drain()
+
+    snapshot, messages = asyncio.run(scenario())
+    deltas = events(messages, "delta")
+    assert snapshot.refreshes == 1
+    assert [c["id"] for c in deltas[0]["conversations"]] == [1, 2]
+    assert deltas[0]["providers"] == {"openai": {"total_conversations": 3, "average_rating": 4.0, "total_ratings": 1}}
+    assert deltas[1]["providers"]["openai"] == {"total_conversations": 3, "average_rating": 3.0, "total_ratings": 2}
+    # A changed rating replaces the old one instead of counting twice
+    assert deltas[2]["providers"]["openai"] == {"total_conversations": 3, "average_rating": 4.5, "total_ratings": 2}
+
+def test_rebuild_waits_for_the_interval_and_a_subscriber():
+    async def scenario():
+        snapshot = StubSnapshot()
+        hub = LiveUpdateHub(snapshot, coalesce_window=0, max_queue=16, rebuild_interval=0.1)
+        hub.start()
+        await asyncio.sleep(0.05)
+        # The initial seed runs without subscribers; writes alone do not trigger another
+        for conversation_id in range(5):
+            hub.publish_conversation(conversation(conversation_id))
+        await asyncio.sleep(0.2)
+        seeded = snapshot.refreshes
+
+        subscriber = hub.subscribe()
+        await asyncio.sleep(0.15)
+        await hub.stop()
+        return seeded, snapshot.refreshes, subscriber.drain()
+
+    seeded, refreshes, messages = asyncio.run(scenario())
+    assert seeded == 1
+    assert refreshes == 2
+    assert events(messages, "analytics") == [{"daily_stats": {}}]
+
+def test_failed_rebuild_is_retried():
+    async def scenario():
+        snapshot = StubSnapshot(fail=True)
+        hub = LiveUpdateHub(snapshot, coalesce_window=0, max_queue=16, rebuild_interval=0.05)
+        hub.subscribe()
+        hub.start()
+        await asyncio.sleep(0.12)
+        await hub.stop()
+        return snapshot.refreshes, hub._needs_rebuild
+
+    refreshes, needs_rebuild = asyncio.run(scenario())
+    assert refreshes >= 2
+    assert needs_rebuild
+
+def test_slow_consumer_gets_a_single_resync():
+    async def scenario():
+        hub = LiveUpdateHub(StubSnapshot(), coalesce_window=0, max_queue=2)
+        subscriber = hub.subscribe()
+        for conversation_id in range(4):
+            hub.publish_conversation(conversation(conversation_id))
+            await asyncio.sleep(0.01)
+        return subscriber.drain()
+
+    assert asyncio.run(scenario()) == [RESYNC]
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+
+from app import database
+from app.database import SessionLocal, Conversation, Rating
+from app.services import RatingService
+
+# Schema as created before answer_source and the unique ratings index were added
+BASELINE_SCHEMA = [
+    """CREATE TABLE conversations (
+        id INTEGER NOT NULL, session_id VARCHAR, user_message TEXT, llm_provider VARCHAR,
+        llm_response TEXT, timestamp DATETIME, PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX ix_conversations_id ON conversations (id)",
+    "CREATE INDEX ix_conversations_session_id ON conversations (session_id)",
+    "CREATE INDEX ix_conversations_llm_provider ON conversations (llm_provider)",
+    """CREATE TABLE ratings (
+        id INTEGER NOT NULL, conversation_id INTEGER, rating INTEGER, feedback TEXT, timestamp DATETIME,
+        PRIMARY KEY (id), FOREIGN KEY(conversation_id) REFERENCES conversations (id)
+    )""",
+    "CREATE INDEX ix_ratings_id ON ratings (id)",
+    """CREATE TABLE faqs (
+        id INTEGER NOT NULL, question TEXT, answer TEXT, category VARCHAR, created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+]
+
+@pytest.fixture
+def baseline_database():
+    """An existing database with the baseline schema, two conversations and a duplicated rating"""
+    database.Base.metadata.drop_all(bind=database.engine)
+    database.engine.dispose()
+    with database.engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text(
+            "INSERT INTO conversations (id, user_message, llm_provider, llm_response) "
+            "VALUES (1, 'q1', 'openai', 'a1'), (2, 'q2', 'google', 'a2')"
+        ))
+        connection.execute(text("INSERT INTO ratings (conversation_id, rating) VALUES (1, 2), (1, 3)"))
+    # Warm several pooled connections with the old schema, as a running server would
+    connections = [database.engine.connect() for _ in range(3)]
+    for connection in connections:
+        connection.execute(text("SELECT * FROM ratings")).all()
+    for connection in connections:
+        connection.close()
+
+    database._schema_ready = False
+    yield
+    database.Base.metadata.drop_all(bind=database.engine)
+    database._schema_ready = False
+
+def test_migrated_database_accepts_ratings(baseline_database, caplog):
+    with caplog.at_level("WARNING", logger="app.database"):
+        database.create_tables()
+    assert "Removed 1 duplicate row" in caplog.text
+
+    service = RatingService()
+    assert [service.save_rating(1, 4) for _ in range(10)] == [True] * 10
+
+    db = SessionLocal()
+    assert [(r.conversation_id, r.rating) for r in db.query(Rating).all()] == [(1, 4)]
+    db.close()
+
+def test_save_rating_for_missing_conversation(db_tables):
+    assert RatingService().save_rating(999, 4) is False
+
+def test_bulk_ratings_report_superseded_items_as_saved(db_tables):
+    db = SessionLocal()
+    db.add_all([Conversation(id=1, llm_provider="openai"), Conversation(id=2, llm_provider="google")])
+    db.commit()
+    db.close()
+
+    results = RatingService().save_ratings([
+        {"conversation_id": 1, "rating": 1},
+        {"conversation_id": 2, "rating": 2},
+        {"conversation_id": 1, "rating": 5, "feedback": "better"},
+        {"conversation_id": 3, "rating": 3},
+    ])
+
+    assert [(r["success"], r["status"]) for r in results] == [
+        (True, "superseded"), (True, "saved"), (True, "saved"), (False, "not_found")
+    ]
+    db = SessionLocal()
+    assert {r.conversation_id: r.rating for r in db.query(Rating).all()} == {1: 5, 2: 2}
+    db.close()
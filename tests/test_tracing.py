@@ -0,0 +1,125 @@
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api
+from app.api import app
+from app.config import settings
+from app.tracing import SlowestTraces, Trace, Tracer, tracer
+
+def test_spans_are_noops_while_disabled():
+    disabled = Tracer(enabled=False, buffer_size=10)
+    with disabled.trace("GET /"):
+        with disabled.span("stage"):
+            pass
+    assert len(disabled.requests) == 0
+
+def test_background_traces_do_not_displace_requests():
+    enabled = Tracer(enabled=True, buffer_size=2)
+    with enabled.trace("POST /api/chat"):
+        with enabled.span("chat.provider_call"):
+            pass
+    for _ in range(5):
+        with enabled.trace("analytics.refresh", background=True):
+            pass
+
+    assert [trace["name"] for trace in enabled.slowest()] == ["POST /api/chat"]
+    assert enabled.slowest()[0]["spans"][0]["name"] == "chat.provider_call"
+    assert len(enabled.slowest(background=True)) == 2
+
+def finished(name: str, duration: float) -> Trace:
+    trace = Trace(name)
+    trace.duration = duration
+    return trace
+
+def test_fast_traces_do_not_evict_a_slow_one():
+    traces = SlowestTraces(size=3, window=60)
+    traces.append(finished("slow", 2.0))
+    for i in range(100):
+        traces.append(finished(f"fast {i}", 0.001 * i))
+
+    assert [trace.name for trace in traces.slowest(2)] == ["slow", "fast 99"]
+    assert len(traces) == 3
+
+def test_slowest_traces_expire_with_their_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.tracing.time.monotonic", lambda: now[0])
+    traces = SlowestTraces(size=3, window=60)
+    traces.append(finished("old", 2.0))
+
+    now[0] += 61
+    traces.append(finished("new", 0.1))
+    # The previous window is still shown
+    assert [trace.name for trace in traces.slowest(5)] == ["old", "new"]
+
+    now[0] += 60
+    assert [trace.name for trace in traces.slowest(5)] == ["new"]
+
+    now[0] += 600
+    assert traces.slowest(5) == []
+
+def test_timed_iter_records_time_spent_producing_items():
+    enabled = Tracer(enabled=True, buffer_size=10)
+
+    def chunks():
+        time.sleep(0.02)
+        yield b"a"
+        time.sleep(0.02)
+        yield b"b"
+
+    with enabled.trace("GET /api/faqs"):
+        stream = enabled.timed_iter("faqs.serialize", chunks())
+    # The body is consumed after the trace context has been left
+    for _ in stream:
+        time.sleep(0.05)
+
+    trace = enabled.requests.slowest(1)[0]
+    [(name, _, duration)] = trace.spans
+    assert name == "faqs.serialize"
+    assert 0.04 <= duration < 0.09
+
+@pytest.mark.parametrize("response_format", ["json", "ndjson"])
+def test_list_endpoints_record_serialize_spans(db_tables, monkeypatch, response_format):
+    monkeypatch.setattr(tracer, "enabled", True)
+    tracer.requests.clear()
+    client = TestClient(app)
+
+    client.get("/api/faqs", params={"format": response_format})
+    client.get("/api/conversations", params={"format": response_format})
+
+    spans = {trace["name"]: [span["name"] for span in trace["spans"]] for trace in tracer.slowest()}
+    assert "faqs.serialize" in spans["GET /api/faqs"]
+    assert "conversations.serialize" in spans["GET /api/conversations"]
+
+def test_chat_response_is_encoded_inside_its_span(db_tables, monkeypatch):
+    async def process_message(message, provider, session_id=None):
+        return {"response": "answer", "provider": provider, "session_id": "s", "conversation_id": 7,
+                "answer_source": "llm", "timestamp": datetime(2024, 1, 1)}
+
+    monkeypatch.setattr(api.chat_service, "process_message", process_message)
+    monkeypatch.setattr(tracer, "enabled", True)
+    tracer.requests.clear()
+
+    response = TestClient(app).post("/api/chat", json={"message": "hi", "provider": "openai"})
+
+    assert response.json()["conversation_id"] == 7
+    assert response.json()["timestamp"] == "2024-01-01T00:00:00"
+    [trace] = tracer.slowest()
+    assert [span["name"] for span in trace["spans"]] == ["chat.serialize"]
+
+def test_traces_stay_readable_after_tracing_is_turned_off(db_tables, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "token")
+    monkeypatch.setattr(tracer, "enabled", False)
+    tracer.requests.clear()
+    headers = {"X-Admin-Token": "token"}
+    client = TestClient(app)
+
+    assert client.get("/api/admin/traces").status_code == 403
+    client.post("/api/admin/tracing", params={"enabled": True}, headers=headers)
+    client.get("/api/faqs")
+    client.post("/api/admin/tracing", params={"enabled": False}, headers=headers)
+
+    traces = client.get("/api/admin/traces", headers=headers).json()["traces"]
+    assert [trace["name"] for trace in traces] == ["GET /api/faqs"]